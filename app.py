@@ -2,30 +2,43 @@
 import os
 import re
 import io
-import math
 import time
 import random
+import functools
+import html
+import threading
 import requests
+import numpy as np
 import pandas as pd
 import streamlit as st
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # =========================
 # Robust HTTP Session (재시도/연결 재사용)
 # =========================
-SESSION = requests.Session()
-SESSION.headers.update({"User-Agent": "MinsukSearch/3.2", "Accept-Encoding": "gzip"})
-_retry = Retry(
-    total=3, connect=3, read=3,
-    backoff_factor=0.7,
-    status_forcelist=[429, 500, 502, 503, 504],
-    allowed_methods=["GET","POST"]
-)
-_adapter = HTTPAdapter(max_retries=_retry, pool_connections=20, pool_maxsize=60)
-SESSION.mount("http://", _adapter)
-SESSION.mount("https://", _adapter)
+# Streamlit 은 상호작용마다 스크립트를 다시 실행하므로 cache_resource 로 세션을 유지해
+# keep-alive TCP/TLS 연결이 rerun 사이에도 재사용되도록 함 (상태 없는 풀이라 사용자 간 공유 OK)
+@st.cache_resource(show_spinner=False)
+def _get_session() -> requests.Session:
+    s = requests.Session()
+    s.headers.update({"User-Agent": "MinsukSearch/3.2", "Accept-Encoding": "gzip"})
+    retry = Retry(
+        total=3, connect=3, read=3,
+        backoff_factor=0.7,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET","POST"]
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=20, pool_maxsize=60)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+SESSION = _get_session()
 
 # =========================
 # Optional OCR
@@ -37,6 +50,32 @@ try:
 except Exception:
     HAS_OCR = False
 
+# =========================
+# Optional fast JSON (orjson 있으면 사용, 없으면 표준 json)
+# =========================
+try:
+    import orjson
+    json_loads = orjson.loads
+except Exception:
+    import json
+    json_loads = json.loads
+
+# =========================
+# Optional disk cache (diskcache 있으면 YouTube 응답을 재시작 후에도 재사용)
+# =========================
+try:
+    import diskcache
+except Exception:
+    diskcache = None
+
+@st.cache_resource(show_spinner=False)
+def _yt_disk_cache():
+    if diskcache is None: return None
+    try:
+        return diskcache.Cache(os.path.join(".cache_http", "youtube"))
+    except Exception:
+        return None
+
 # =========================
 # Keys / Const
 # =========================
@@ -52,9 +91,27 @@ CSE_CX           = st.secrets.get("CSE_CX", os.getenv("CSE_CX", ""))
 
 YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
 YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+# partial response — 실제로 읽는 필드만 받아 응답 크기/파싱 비용 축소
+YT_SEARCH_FIELDS   = "nextPageToken,items(id/videoId)"
+YT_VIDEO_FIELDS    = ("nextPageToken,items(id,snippet(title,channelTitle,channelId,publishedAt,description,"
+                      "thumbnails(default/url,medium/url,high/url)),"
+                      "statistics(viewCount,likeCount,commentCount),contentDetails/duration)")
 REQUEST_TIMEOUT    = 12
 MAX_YT_PER_QUERY   = 500
 PAGE_SIZE_FIXED    = 15  # 한 페이지 15 고정
+MAX_WORKERS        = 8   # 병렬 API 호출 스레드 수 (SESSION pool_maxsize 이내)
+KEY_COOLDOWN_SEC   = 3600  # quotaExceeded 키 재시도 대기 (쿼터 리셋은 PT 자정이지만 보수적으로 1시간)
+YT_DISK_CACHE_TTL  = 24*3600  # 디스크 캐시 만료 (st.cache_data TTL 보다 길게 — 쿼터 절약용)
+
+# 사이드바 라벨 → API 값 (selectbox 옵션 순서 = dict 순서)
+ACCENT_MAP = {"기본":"#00A389","블루":"#2F80ED","그린":"#27AE60","핑크":"#EB5757","보라":"#A259FF"}
+REGION_MAP = {"자동":"", "한국(KR)":"KR", "미국(US)":"US", "일본(JP)":"JP", "영국(GB)":"GB",
+              "독일(DE)":"DE", "프랑스(FR)":"FR", "인도(IN)":"IN", "인도네시아(ID)":"ID", "브라질(BR)":"BR", "멕시코(MX)":"MX"}
+LANG_MAP   = {"자동":"", "한국어(ko)":"ko", "영어(en)":"en", "일본어(ja)":"ja", "스페인어(es)":"es", "프랑스어(fr)":"fr", "독일어(de)":"de",
+              "인도네시아어(id)":"id", "포르투갈어(pt)":"pt", "힌디어(hi)":"hi"}
+YLEN_MAP   = {"전체":"any","짧음(<4분)":"short","중간(4~20분)":"medium","긴(>20분)":"long"}
+# 원본찾기 site: 검색 대상
+TRACE_SITE_POOL = ("tiktok.com","instagram.com","facebook.com","x.com","twitter.com","reddit.com","9gag.com","imgur.com","bilibili.com","tv.naver.com","kakao.tv")
 
 # =========================
 # Helpers
@@ -62,41 +119,86 @@ PAGE_SIZE_FIXED    = 15  # 한 페이지 15 고정
 def http_get(url, params=None, headers=None, timeout=REQUEST_TIMEOUT):
     r = SESSION.get(url, params=params, headers=headers, timeout=timeout)
     r.raise_for_status()
-    return r.json()
+    return json_loads(r.content)
 
 def http_get_bytes(url, timeout=10):
     r = SESSION.get(url, timeout=timeout)
     r.raise_for_status()
     return r.content
 
-def yt_get(url: str, params: dict, timeout=REQUEST_TIMEOUT):
+def ctx_executor(max_workers: int = MAX_WORKERS) -> ThreadPoolExecutor:
+    """
+    워커 스레드에서도 st.session_state / st.warning 을 쓸 수 있도록
+    현재 ScriptRunContext 를 붙여주는 스레드 풀.
+    """
+    ctx = get_script_run_ctx()
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+    )
+
+@st.cache_resource(show_spinner=False)
+def _yt_key_cooldowns() -> dict[str, float]:
+    """ API 키 → 쿨다운 만료 시각(epoch). rerun/사용자 간에 공유 """
+    return {}
+
+def _yt_disk_cacheable(url: str, params: dict) -> bool:
+    """
+    디스크 캐시 대상: id 지정 videos.list, 기간/최신순이 아닌 search.list 만.
+    인기 차트(chart=mostPopular)·order=date·publishedAfter(현재 시각 기준) 요청은 결과가 시간에 따라 바뀌므로 제외.
+    """
+    if url == YOUTUBE_VIDEOS_URL: return "id" in params
+    if url == YOUTUBE_SEARCH_URL: return params.get("order") != "date" and "publishedAfter" not in params
+    return False
+
+def yt_get(url: str, params: dict, timeout=REQUEST_TIMEOUT, *, page_token: str | None = None):
     """
     YouTube API 호출 시 키 자동 로테이션.
     quotaExceeded/403 등 발생하면 다음 키로 변경하여 재시도.
+    쿼터 소진된 키는 KEY_COOLDOWN_SEC 동안 요청 없이 건너뜀.
     성공한 키 인덱스를 세션에 고정.
+    params 는 복사하지 않고 (key, value) 튜플 목록 뒤에 pageToken / key 만 덧붙여 전송.
+    diskcache 가 있으면 (url, 키 제외 파라미터) 로 성공 응답을 YT_DISK_CACHE_TTL 동안 재사용
+    (_yt_disk_cacheable 인 요청만).
     """
     if not YOUTUBE_API_KEYS:
         raise RuntimeError("YouTube API Key가 없습니다. secrets.toml에 YOUTUBE_API_KEY를 설정하세요.")
+    base = list(params.items())
+    if page_token: base.append(("pageToken", page_token))
+    dcache = _yt_disk_cache() if _yt_disk_cacheable(url, params) else None
+    dkey = (url, tuple(sorted(base)))
+    if dcache is not None:
+        try:
+            hit = dcache.get(dkey)
+            if hit is not None: return hit
+        except Exception:
+            pass
     last_err = None
+    cooldowns = _yt_key_cooldowns()
     start_idx = st.session_state.get("yt_key_idx", 0)
     for offset in range(len(YOUTUBE_API_KEYS)):
         idx = (start_idx + offset) % len(YOUTUBE_API_KEYS)
         key = YOUTUBE_API_KEYS[idx]
-        p = dict(params); p["key"] = key
+        if time.time() < cooldowns.get(key, 0): continue
         try:
-            r = SESSION.get(url, params=p, timeout=timeout)
+            r = SESSION.get(url, params=base + [("key", key)], timeout=timeout)
             if r.status_code == 403:
                 try:
-                    js = r.json()
+                    js = json_loads(r.content)
                     reason = js.get("error", {}).get("errors", [{}])[0].get("reason", "")
                     if reason == "quotaExceeded":
+                        cooldowns[key] = time.time() + KEY_COOLDOWN_SEC
                         st.warning(f"YouTube 키 #{idx+1} 쿼터 소진. 다음 키로 전환합니다.")
                         continue
                 except Exception:
                     pass
             r.raise_for_status()
             st.session_state["yt_key_idx"] = idx
-            return r.json()
+            data = json_loads(r.content)
+            if dcache is not None:
+                try: dcache.set(dkey, data, expire=YT_DISK_CACHE_TTL)
+                except Exception: pass
+            return data
         except requests.exceptions.HTTPError as e:
             last_err = e
             continue
@@ -105,8 +207,14 @@ def yt_get(url: str, params: dict, timeout=REQUEST_TIMEOUT):
             continue
     if last_err:
         raise last_err
+    if all(time.time() < cooldowns.get(k, 0) for k in YOUTUBE_API_KEYS):
+        raise RuntimeError("YouTube API 키가 모두 quotaExceeded 쿨다운 중입니다.")
     raise RuntimeError("YouTube API 요청 실패(원인 불명)")
 
+def split_csv(text: str | None) -> tuple[str, ...]:
+    """ "a, b,,c" → ("a","b","c") """
+    return tuple(p.strip() for p in (text or "").split(",") if p.strip())
+
 def fmt_int(n):
     try: n = int(n)
     except: return n
@@ -115,9 +223,19 @@ def fmt_int(n):
     if n >= 1_000:         return f"{n/1_000:.1f}K"
     return str(n)
 
+def fmt_duration(seconds: int) -> str:
+    """ str(timedelta(seconds=...)) 와 같은 H:MM:SS 표기를 정수 연산만으로 """
+    if not seconds: return ""
+    h, r = divmod(int(seconds), 3600); m, sec = divmod(r, 60)
+    return f"{h}:{m:02d}:{sec:02d}"
+
+_ISO_DUR_RE = re.compile(r"^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$")
+
+# 같은 길이 문자열(PT15S, PT1M 등)이 결과마다 반복되므로 파싱 결과를 메모
+@functools.lru_cache(maxsize=4096)
 def parse_iso8601_duration(s: str) -> int:
     if not s: return 0
-    m = re.match(r"^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$", s)
+    m = _ISO_DUR_RE.match(s)
     if not m: return 0
     h = int(m.group(1) or 0); mi = int(m.group(2) or 0); se = int(m.group(3) or 0)
     return h*3600 + mi*60 + se
@@ -132,48 +250,101 @@ def published_after_from_option(opt: str) -> str | None:
     dt = mapping.get(opt)
     return dt.isoformat().replace("+00:00","Z") if dt else None
 
-def compute_engagement_score(stats: dict) -> float:
-    try:
-        v = max(1, int(stats.get("viewCount", 0) or 0))
-        l = int(stats.get("likeCount", 0) or 0)
-        c = int(stats.get("commentCount", 0) or 0)
-        return (l + c) / (v ** 0.85)
-    except Exception:
-        return 0.0
+def engagement_scores(stats_list: list[dict]) -> np.ndarray:
+    """ 참여도 점수 (좋아요+댓글) / 조회수^0.85 — 거듭제곱/나눗셈은 NumPy 로 한 번에 """
+    n = len(stats_list)
+    views, inter = np.ones(n), np.zeros(n)
+    for i, stats in enumerate(stats_list):
+        try:
+            v = max(1, int(stats.get("viewCount", 0) or 0))
+            lc = int(stats.get("likeCount", 0) or 0) + int(stats.get("commentCount", 0) or 0)
+        except Exception:
+            continue  # 파싱 실패 행은 0점
+        views[i], inter[i] = v, lc
+    return inter / np.power(views, 0.85)
 
 # ---------- 번역 유틸 ----------
+_HANGUL_RE = re.compile(r"[가-힣]")
+
 def has_hangul(s: str) -> bool:
-    return bool(re.search(r"[가-힣]", s or ""))
+    return bool(_HANGUL_RE.search(s or ""))
 
-def translate_to_ko(text: str) -> str:
+DEEPL_TRANSLATE_URL = "https://api-free.deepl.com/v2/translate"
+DEEPL_BATCH_MAX     = 50  # DeepL 한 요청당 text 필드 최대 개수
+
+_LATIN_WORD_RE = re.compile(r"[A-Za-z]{3,}")
+
+class _TranslateFailed(Exception):
+    """ 번역 API 가 모두 실패 — lru_cache 는 예외를 캐시하지 않으므로 다음 호출에서 다시 시도 """
+
+def _mymemory_skips(text: str) -> bool:
+    # mymemory 는 en→ko 고정 — 영단어가 없는 문자열(URL 조각/이모지/숫자/일본어 등)은 호출하지 않음
+    return len(text) < 2 or not _LATIN_WORD_RE.search(text)
+
+def _translate_mymemory(text: str, *, strict: bool = False) -> str:
+    if _mymemory_skips(text): return text
+    try:
+        js = http_get("https://api.mymemory.translated.net/get", {"q": text, "langpair": "en|ko"}, timeout=10)
+        if js and js.get("responseData", {}).get("translatedText"):
+            return js["responseData"]["translatedText"]
+    except Exception:
+        pass
+    if strict: raise _TranslateFailed(text)
+    return text
+
+@functools.lru_cache(maxsize=4096)  # 같은 문자열은 프로세스 내에서 한 번만 번역 API 호출 (성공한 결과만 캐시)
+def _translate_to_ko_cached(text: str) -> str:
     try:
-        if not text or has_hangul(text): return text
         if DEEPL_API_KEY:
-            url = "https://api-free.deepl.com/v2/translate"
             data = {"auth_key": DEEPL_API_KEY, "text": text, "target_lang": "KO"}
-            r = SESSION.post(url, data=data, timeout=10)
+            r = SESSION.post(DEEPL_TRANSLATE_URL, data=data, timeout=10)
             if r.status_code == 200:
-                js = r.json()
+                js = json_loads(r.content)
                 trs = js.get("translations", [])
                 if trs: return trs[0].get("text", text)
-        js = http_get("https://api.mymemory.translated.net/get", {"q": text, "langpair": "en|ko"}, timeout=10)
-        if js and js.get("responseData", {}).get("translatedText"):
-            return js["responseData"]["translatedText"]
     except Exception:
         pass
-    return text
+    # DeepL 을 시도했는데 실패했고 mymemory 대상도 아니면 원문 반환은 "결과" 가 아니라 실패 — 캐시하지 않음
+    if DEEPL_API_KEY and _mymemory_skips(text): raise _TranslateFailed(text)
+    return _translate_mymemory(text, strict=True)
 
-def translate_block_to_ko(text: str) -> str:
-    if not text: return text
-    parts = re.split(r"(\n{2,})", text)
-    out = []
-    for p in parts:
-        if p.strip()=="" or p.startswith("\n"):
-            out.append(p)
-        else:
-            out.append(translate_to_ko(p))
-            time.sleep(0.1)
-    return "".join(out)
+def translate_to_ko(text: str) -> str:
+    if not text or has_hangul(text): return text
+    try:
+        return _translate_to_ko_cached(text)
+    except _TranslateFailed:
+        return text  # 실패 시 원문 표시 — 캐시하지 않음
+
+def translate_many_to_ko(texts: list[str]) -> list[str]:
+    """
+    여러 문단을 한 번에 번역. DeepL 은 text 필드를 반복해서 보내면 배치로 처리하므로
+    최대 50개씩 한 요청으로 묶고, DeepL 이 처리하지 못한 항목만 mymemory 로 개별 폴백.
+    같은 문자열([Music] 반복 등)은 한 번만 번역해서 모든 위치에 되돌려 끼움.
+    번역이 필요한 항목이 하나라도 실패하면 _TranslateFailed (캐시된 호출자가 실패를 저장하지 않도록).
+    """
+    uniq = list(dict.fromkeys(t for t in texts if t and not has_hangul(t)))
+    trans = {}
+    if DEEPL_API_KEY:
+        for b in range(0, len(uniq), DEEPL_BATCH_MAX):
+            batch = uniq[b:b+DEEPL_BATCH_MAX]
+            data = [("auth_key", DEEPL_API_KEY), ("target_lang", "KO")] + [("text", t) for t in batch]
+            try:
+                r = SESSION.post(DEEPL_TRANSLATE_URL, data=data, timeout=10)
+                if r.status_code != 200: continue
+                for t, tr in zip(batch, json_loads(r.content).get("translations", [])):
+                    if tr.get("text"): trans[t] = tr["text"]
+            except Exception:
+                continue
+    for t in uniq:
+        if t in trans: continue
+        if DEEPL_API_KEY and _mymemory_skips(t): raise _TranslateFailed(t)
+        trans[t] = _translate_mymemory(t, strict=True)
+    return [trans.get(t, t) for t in texts]
+
+@st.cache_data(show_spinner=False, ttl=24*3600)
+def translate_chunks_to_ko(texts: tuple[str, ...]) -> list[str]:
+    """ 이미 잘라 둔 조각들을 순서대로 번역 (배치 1회, 성공한 결과만 캐시 — 실패는 _TranslateFailed) """
+    return translate_many_to_ko(list(texts))
 
 # =========================
 # Age keyword map
@@ -201,34 +372,35 @@ GENERIC_GAME_NEG = [
     "배그","pubg","steam","스팀","xbox","ps5","플스","닌텐도","nintendo","switch","스위치"
 ]
 
-def build_age_neg_keywords():
+def build_age_neg_keywords() -> dict[str, frozenset[str]]:
+    """ 연령대별 '다른 연령대 키워드' 집합 (소문자화는 여기서 한 번만) """
     tags = list(AGE_KEYWORDS.keys())
-    neg = {}
-    for t in tags:
-        others = []
-        for t2 in tags:
-            if t2 == t: continue
-            others.extend(AGE_KEYWORDS[t2])
-        neg[t] = sorted(set([o.lower() for o in others]))
-    return neg
+    return {t: frozenset(o.lower() for t2 in tags if t2 != t for o in AGE_KEYWORDS[t2]) for t in tags}
 
 AGE_NEG_KEYWORDS = build_age_neg_keywords()
 
+def _alternation_re(words) -> re.Pattern:
+    """ 키워드 목록(소문자) → 한 번의 스캔으로 검사하는 정규식. 빈 목록은 절대 매칭되지 않음 """
+    ws = sorted({w.lower() for w in words}, key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, ws)) if ws else "(?!)")
+
+AGE_POS_SET         = {tag: frozenset(k.lower() for k in kws) for tag, kws in AGE_KEYWORDS.items()}
+AGE_POS_RE          = {tag: _alternation_re(kws) for tag, kws in AGE_KEYWORDS.items()}
+AGE_NEG_RE          = {tag: _alternation_re(kws) for tag, kws in AGE_NEG_KEYWORDS.items()}
+GENERIC_GAME_NEG_RE = _alternation_re(GENERIC_GAME_NEG)
+
 def age_relevance_score(title: str, age_tag: str) -> int:
     if not title or age_tag not in AGE_KEYWORDS: return 0
     t = title.lower()
-    score = 0
-    for kw in AGE_KEYWORDS[age_tag]:
-        if kw.lower() in t:
-            score += 1
-    return score
+    if not AGE_POS_RE[age_tag].search(t): return 0  # 대부분의 제목은 여기서 한 번의 스캔으로 끝남
+    return sum(1 for kw in AGE_POS_SET[age_tag] if kw in t)
 
 def age_negative_hit(title: str, age_tag: str) -> bool:
     if not title or age_tag not in AGE_NEG_KEYWORDS: return False
     t = title.lower()
-    if any(neg in t for neg in AGE_NEG_KEYWORDS[age_tag]):
+    if AGE_NEG_RE[age_tag].search(t):
         return True
-    if age_tag != "10대" and any(kw in t for kw in [g.lower() for g in GENERIC_GAME_NEG]):
+    if age_tag != "10대" and GENERIC_GAME_NEG_RE.search(t):
         return True
     return False
 
@@ -239,14 +411,14 @@ def init_state():
     s = st.session_state
     s.setdefault("page", 1)
     s["page_size"] = PAGE_SIZE_FIXED
-    s.setdefault("search_history", [])
+    s.setdefault("search_history", deque(maxlen=10))  # 최근 검색 10개 (오래된 것부터 자동 밀려남)
     s.setdefault("yt_sort", "조회수순")
     s.setdefault("accent", "기본")
     s.setdefault("yt_fetch_limit", 100)
     s.setdefault("analysis_target", None)
     s.setdefault("trigger_analysis", False)
     s.setdefault("reco_clicks", 0)
-    s.setdefault("results_df", pd.DataFrame())
+    s.setdefault("results", [])  # 검색 결과 행 dict 리스트 (DataFrame 은 만들지 않음)
     s.setdefault("last_query", "")
     s.setdefault("last_params", {})
     s.setdefault("age_filter", "전체")
@@ -265,13 +437,13 @@ def init_state():
 def estimate_units_for_youtube_search(fetch_total: int) -> int:
     """ search.list: 100 units/page(50개) + videos.list: 1 unit/50개 """
     ft = max(1, min(int(fetch_total), MAX_YT_PER_QUERY))
-    pages = math.ceil(ft / 50)         # search.list 호출 수
-    v_chunks = math.ceil(ft / 50)      # videos.list 호출 수
+    pages = -(-ft // 50)         # search.list 호출 수
+    v_chunks = -(-ft // 50)      # videos.list 호출 수
     return pages * 100 + v_chunks * 1  # 단순 상한 추정
 
 def estimate_units_for_trending(fetch_total: int = 200) -> int:
     """ videos.list(chart=mostPopular) 1 unit/page """
-    pages = math.ceil(fetch_total / 50)
+    pages = -(-fetch_total // 50)
     return pages * 1
 
 def estimate_units_for_kwboard(per_keyword: int = 6, keywords: int = 8) -> int:
@@ -282,11 +454,35 @@ def estimate_units_for_kwboard(per_keyword: int = 6, keywords: int = 8) -> int:
 # =========================
 # Data: YouTube
 # =========================
-@st.cache_data(show_spinner=False, ttl=900)
+def video_filter_mask(df: pd.DataFrame, *, include_words: list[str], exclude_words: list[str],
+                      include_channels: list[str], exclude_channels: list[str],
+                      include_channel_ids: list[str], exclude_channel_ids: list[str],
+                      min_seconds: int | None, max_seconds: int | None):
+    """
+    title / author / channelId / seconds 컬럼을 가진 df 에 대해 검색 필터 통과 여부(bool ndarray).
+    포함 단어는 전부 일치, 제외 단어는 하나라도 일치하면 제외.
+    """
+    m = pd.Series(True, index=df.index)
+    if include_words or exclude_words:
+        title_l = df["title"].str.lower()
+        for w in include_words:
+            m &= title_l.str.contains(w.lower(), regex=False)
+        if exclude_words:
+            m &= ~title_l.str.contains("|".join(re.escape(w.lower()) for w in exclude_words), regex=True)
+    if include_channels:    m &= df["author"].isin(set(include_channels))
+    if exclude_channels:    m &= ~df["author"].isin(set(exclude_channels))
+    if include_channel_ids: m &= df["channelId"].isin(set(include_channel_ids))
+    if exclude_channel_ids: m &= ~df["channelId"].isin(set(exclude_channel_ids))
+    if min_seconds is not None: m &= df["seconds"] >= min_seconds
+    if max_seconds is not None: m &= df["seconds"] <= max_seconds
+    return m.to_numpy()
+
+# 결과는 인자만으로 결정되어야 캐시 키가 정확함 (session_state 참조 금지) — 리스트 인자는 튜플로 넘김
+@st.cache_data(show_spinner=False, ttl=900, max_entries=64)
 def search_youtube(query: str, *, fetch_total: int, cc_only: bool, upload_window: str,
-                   include_channels: list[str], exclude_channels: list[str],
-                   include_channel_ids: list[str], exclude_channel_ids: list[str],
-                   include_words: list[str], exclude_words: list[str],
+                   include_channels: tuple[str, ...], exclude_channels: tuple[str, ...],
+                   include_channel_ids: tuple[str, ...], exclude_channel_ids: tuple[str, ...],
+                   include_words: tuple[str, ...], exclude_words: tuple[str, ...],
                    region_code: str | None, relevance_lang: str | None,
                    safe_mode: str, order_mode: str,
                    duration_param: str,
@@ -297,13 +493,15 @@ def search_youtube(query: str, *, fetch_total: int, cc_only: bool, upload_window
 
     fetch_total = max(1, min(int(fetch_total), MAX_YT_PER_QUERY))
     per_page = 50
-    collected_ids, page_token = [], None
 
+    # 제목 포함/제외 단어는 검색어에 싣지 않음: 서버는 토큰 단위로 매칭해서 ("cat" ≠ "Catalog", 한글 복합어)
+    # 클라이언트의 부분 문자열 필터가 통과시킬 영상까지 걸러냄
     base_params = {
         "part": "snippet", "q": query, "maxResults": per_page,
-        "type": "video", "order": order_mode,
+        "type": "video", "order": order_mode, "fields": YT_SEARCH_FIELDS,
     }
     if cc_only: base_params["videoLicense"] = "creativeCommon"
+    if len(include_channel_ids) == 1: base_params["channelId"] = include_channel_ids[0]  # 단일 채널이면 서버에서 한정
     if region_code: base_params["regionCode"] = region_code
     if relevance_lang: base_params["relevanceLanguage"] = relevance_lang
     if safe_mode in ("none","moderate","strict"): base_params["safeSearch"] = safe_mode
@@ -311,25 +509,31 @@ def search_youtube(query: str, *, fetch_total: int, cc_only: bool, upload_window
     pub_after = published_after_from_option(upload_window)
     if pub_after: base_params["publishedAfter"] = pub_after
 
+    collected_ids, page_token = {}, None  # dict 를 순서 있는 집합으로 사용 (수집하면서 중복 제거)
     while len(collected_ids) < fetch_total:
-        params = dict(base_params)
-        if page_token: params["pageToken"] = page_token
-        sjson = yt_get(YOUTUBE_SEARCH_URL, params=params)
+        # 마지막 페이지는 남은 개수만 요청 (쿼터는 같지만 응답/파싱량 감소)
+        params = {**base_params, "maxResults": min(per_page, fetch_total - len(collected_ids))}
+        sjson = yt_get(YOUTUBE_SEARCH_URL, params, page_token=page_token)
         items = sjson.get("items", [])
         ids = [it.get("id", {}).get("videoId") for it in items if it.get("id", {}).get("videoId")]
         if not ids: break
-        collected_ids.extend(ids)
+        for vid in ids:
+            collected_ids.setdefault(vid, None)
         page_token = sjson.get("nextPageToken")
         if not page_token or len(collected_ids) >= fetch_total: break
 
-    collected_ids = list(dict.fromkeys(collected_ids))[:fetch_total]
+    collected_ids = list(collected_ids)[:fetch_total]
     if not collected_ids: return []
 
-    out = []
-    for i in range(0, len(collected_ids), 50):
-        chunk = collected_ids[i:i+50]
-        params2 = {"part": "snippet,statistics,contentDetails", "id": ",".join(chunk)}
-        vjson = yt_get(YOUTUBE_VIDEOS_URL, params=params2)
+    # videos.list 는 50개 단위 청크를 병렬로 호출 (결과 순서는 제출 순서 유지)
+    def _fetch_chunk(chunk):
+        return yt_get(YOUTUBE_VIDEOS_URL, params={"part": "snippet,statistics,contentDetails", "id": ",".join(chunk), "fields": YT_VIDEO_FIELDS})
+    chunks = [collected_ids[i:i+50] for i in range(0, len(collected_ids), 50)]
+    with ctx_executor() as ex:
+        vjsons = list(ex.map(_fetch_chunk, chunks))
+
+    rows, channel_ids = [], []
+    for vjson in vjsons:
         for v in vjson.get("items", []):
             vid = v["id"]
             sn  = v.get("snippet", {})
@@ -337,73 +541,83 @@ def search_youtube(query: str, *, fetch_total: int, cc_only: bool, upload_window
             cd  = v.get("contentDetails", {})
             thumbs = sn.get("thumbnails", {})
             thumb = (thumbs.get("high") or thumbs.get("medium") or thumbs.get("default") or {}).get("url")
+            thumb_card = (thumbs.get("medium") or {}).get("url") or thumb
             seconds = parse_iso8601_duration(cd.get("duration"))
             is_shorts = seconds <= 60 if seconds else False
 
-            title = sn.get("title") or ""
-            channel_title = sn.get("channelTitle", "")
-            channel_id = sn.get("channelId", "")
-            title_l = title.lower()
-
-            # 필터링
-            if include_words and not all(w.lower() in title_l for w in include_words): continue
-            if exclude_words and any(w.lower() in title_l for w in exclude_words): continue
-            if include_channels and channel_title not in include_channels: continue
-            if exclude_channels and channel_title in exclude_channels: continue
-            if include_channel_ids and channel_id not in include_channel_ids: continue
-            if exclude_channel_ids and channel_id in exclude_channel_ids: continue
-            if (min_seconds is not None and seconds < min_seconds) or (max_seconds is not None and seconds > max_seconds): continue
-
-            out.append({
+            rows.append({
                 "platform": "YouTube",
-                "title": title,
-                "author": channel_title,
+                "title": sn.get("title") or "",
+                "author": sn.get("channelTitle", ""),
                 "views": int(stt.get("viewCount", 0)) if stt.get("viewCount") else None,
                 "url": f"https://www.youtube.com/watch?v={vid}",
                 "videoId": vid,
                 "thumbnail": thumb,
+                "thumbCard": thumb_card,
                 "publishedAt": sn.get("publishedAt"),
                 "durationSec": seconds,
-                "durationText": str(timedelta(seconds=seconds)) if seconds else "",
+                "durationText": fmt_duration(seconds),
                 "isShorts": is_shorts,
                 "description": sn.get("description",""),
             })
-        time.sleep(0.12)
+            channel_ids.append(sn.get("channelId", ""))
+
+    # 필터링 — 행 단위 루프 대신 pandas 벡터 마스크 (행 dict 자체는 dtype 변환 없이 그대로 유지)
+    # 대부분의 검색은 필터가 비어 있으므로 그 경우엔 DataFrame 생성/마스크 계산 자체를 생략
+    if not rows: return []
+    has_filters = (include_words or exclude_words or include_channels or exclude_channels
+                   or include_channel_ids or exclude_channel_ids
+                   or min_seconds is not None or max_seconds is not None)
+    if not has_filters:
+        out = rows
+    else:
+        fdf = pd.DataFrame({
+            "title": [r["title"] for r in rows],
+            "author": [r["author"] for r in rows],
+            "channelId": channel_ids,
+            "seconds": [r["durationSec"] for r in rows],
+        })
+        keep = video_filter_mask(
+            fdf,
+            include_words=include_words, exclude_words=exclude_words,
+            include_channels=include_channels, exclude_channels=exclude_channels,
+            include_channel_ids=include_channel_ids, exclude_channel_ids=exclude_channel_ids,
+            min_seconds=min_seconds, max_seconds=max_seconds,
+        )
+        out = [r for r, k in zip(rows, keep) if k]
 
-    # 기본 정렬
-    if st.session_state.yt_sort == "조회수순":
-        out.sort(key=lambda x: (x["views"] or -1), reverse=True)
+    # 기본 정렬 기준 (조회수순 / 최신순) — order_mode 와 동일하게
+    if order_mode == "viewCount":
+        base_key = lambda x: (x["views"] or -1)
     else:
-        out.sort(key=lambda x: x.get("publishedAt","") or "", reverse=True)
+        base_key = lambda x: x.get("publishedAt","") or ""
 
     # 연령대 필터 — 블랙리스트 제외 + 해당 연령 키워드 최소 1개 매칭 강제
+    # 정렬은 필터 후 한 번만: (연령 점수, 조회수) 우선, 동점은 기본 정렬 기준
     if age_tag != "전체":
         out = [r for r in out if not age_negative_hit(r.get("title",""), age_tag)]
         for r in out:
             r["_age_score"] = age_relevance_score(r.get("title",""), age_tag)
         out = [r for r in out if r.get("_age_score", 0) >= 1]
-        out.sort(key=lambda x: (x.get("_age_score",0), x.get("views") or 0), reverse=True)
+        out.sort(key=lambda x: (x.get("_age_score",0), x.get("views") or 0, base_key(x)), reverse=True)
+    else:
+        out.sort(key=base_key, reverse=True)
 
-    # dedup
-    seen, deduped = set(), []
-    for r in out:
-        u = r.get("url")
-        if u and u not in seen:
-            deduped.append(r); seen.add(u)
-    return deduped
+    # videoId 는 수집 단계에서 이미 중복 제거됨 (URL 은 videoId 와 1:1) — 별도 dedup 불필요
+    return out
 
 @st.cache_data(show_spinner=False, ttl=600)
 def fetch_trending_with_engagement(region_code: str | None, fetch_total: int, order_mode: str,
                                    age_tag: str = "전체", salt: int = 0):
     if not YOUTUBE_API_KEYS: return []
-    per_page, collected, page_token = 50, [], None
+    per_page, raw_items, page_token = 50, [], None
     region = region_code or "KR"
+    params = {"part":"snippet,contentDetails,statistics","chart":"mostPopular","regionCode":region,"maxResults":per_page,"fields":YT_VIDEO_FIELDS}
 
-    while len(collected) < fetch_total:
-        params = {"part":"snippet,contentDetails,statistics","chart":"mostPopular","regionCode":region,"maxResults":per_page}
-        if page_token: params["pageToken"] = page_token
+    # 페이지 요청 루프는 응답 수집만 (nextPageToken 체인이라 순차 호출 불가피)
+    while len(raw_items) < fetch_total:
         try:
-            data = yt_get(YOUTUBE_VIDEOS_URL, params=params)
+            data = yt_get(YOUTUBE_VIDEOS_URL, params, page_token=page_token)
         except requests.exceptions.HTTPError as e:
             reason = ""
             try:
@@ -416,21 +630,27 @@ def fetch_trending_with_engagement(region_code: str | None, fetch_total: int, or
 
         items = data.get("items", [])
         if not items: break
-        for v in items:
-            vid = v["id"]; sn=v.get("snippet",{}); stt=v.get("statistics",{}); cd=v.get("contentDetails",{})
-            thumbs = sn.get("thumbnails",{})
-            thumb = (thumbs.get("high") or thumbs.get("medium") or thumbs.get("default") or {}).get("url")
-            seconds = parse_iso8601_duration(cd.get("duration")); is_shorts = seconds<=60 if seconds else False
-            collected.append({
-                "platform":"YouTube","title":sn.get("title",""),"author":sn.get("channelTitle",""),
-                "views": int(stt.get("viewCount",0)) if stt.get("viewCount") else None,
-                "url":f"https://www.youtube.com/watch?v={vid}","videoId":vid,"thumbnail":thumb,
-                "publishedAt":sn.get("publishedAt"),"durationSec":seconds,"durationText":str(timedelta(seconds=seconds)) if seconds else "",
-                "isShorts":is_shorts,"_eng_score":compute_engagement_score(stt),
-                "description": sn.get("description",""),
-            })
+        raw_items.extend(items)
         page_token = data.get("nextPageToken")
-        if not page_token or len(collected) >= fetch_total: break
+        if not page_token or len(raw_items) >= fetch_total: break
+
+    # 행 변환은 네트워크 구간 밖에서 한 번에
+    collected = []
+    eng = engagement_scores([v.get("statistics",{}) for v in raw_items])
+    for v, eng_score in zip(raw_items, eng):
+        vid = v["id"]; sn=v.get("snippet",{}); stt=v.get("statistics",{}); cd=v.get("contentDetails",{})
+        thumbs = sn.get("thumbnails",{})
+        thumb = (thumbs.get("high") or thumbs.get("medium") or thumbs.get("default") or {}).get("url")
+        thumb_card = (thumbs.get("medium") or {}).get("url") or thumb
+        seconds = parse_iso8601_duration(cd.get("duration")); is_shorts = seconds<=60 if seconds else False
+        collected.append({
+            "platform":"YouTube","title":sn.get("title",""),"author":sn.get("channelTitle",""),
+            "views": int(stt.get("viewCount",0)) if stt.get("viewCount") else None,
+            "url":f"https://www.youtube.com/watch?v={vid}","videoId":vid,"thumbnail":thumb,"thumbCard":thumb_card,
+            "publishedAt":sn.get("publishedAt"),"durationSec":seconds,"durationText":fmt_duration(seconds),
+            "isShorts":is_shorts,"_eng_score":float(eng_score),
+            "description": sn.get("description",""),
+        })
 
     if order_mode == "viewCount":
         collected.sort(key=lambda x: (x.get("views") or -1), reverse=True)
@@ -460,26 +680,37 @@ def build_age_seed_queries(age_tag: str, topk: int = 8) -> list[str]:
         qs.append(keys[len(qs)])
     return qs or ["교양", "뉴스"]
 
+def _age_seed_search(q: str, age_tag: str, region_code: str, fetch_total: int) -> list[dict]:
+    return search_youtube(
+        q, fetch_total=fetch_total,
+        cc_only=False, upload_window="최근 1년",
+        include_channels=(), exclude_channels=(),
+        include_channel_ids=(), exclude_channel_ids=(),
+        include_words=(), exclude_words=(),
+        region_code=region_code, relevance_lang=None,
+        safe_mode="moderate", order_mode="viewCount",
+        duration_param="any", min_seconds=None, max_seconds=None,
+        age_tag=age_tag,
+    )
+
+def _age_seed_search_many(qs: list[str], age_tag: str, region_code: str, fetch_total: int) -> dict:
+    """ 시드 키워드별 검색을 병렬로 실행. 실패한 키워드는 빈 리스트. 반환 순서는 qs 순서 유지 """
+    results = {q: [] for q in qs}
+    with ctx_executor() as ex:
+        futures = {ex.submit(_age_seed_search, q, age_tag, region_code, fetch_total): q for q in qs}
+        for fut in as_completed(futures):
+            try:
+                results[futures[fut]] = fut.result()
+            except Exception:
+                continue
+    return results
+
 @st.cache_data(show_spinner=False, ttl=600)
 def fallback_age_recommendations(age_tag: str, region_code: str, fetch_total_per_q: int = 30) -> list[dict]:
     qs = build_age_seed_queries(age_tag)
     gathered = []
-    for q in qs:
-        try:
-            res = search_youtube(
-                q, fetch_total=fetch_total_per_q,
-                cc_only=False, upload_window="최근 1년",
-                include_channels=[], exclude_channels=[],
-                include_channel_ids=[], exclude_channel_ids=[],
-                include_words=[], exclude_words=[],
-                region_code=region_code, relevance_lang=None,
-                safe_mode="moderate", order_mode="viewCount",
-                duration_param="any", min_seconds=None, max_seconds=None,
-                age_tag=age_tag,
-            )
-            gathered.extend(res)
-        except Exception:
-            continue
+    for res in _age_seed_search_many(qs, age_tag, region_code, fetch_total_per_q).values():
+        gathered.extend(res)
     seen, dedup = set(), []
     for r in gathered:
         u = r.get("url")
@@ -491,51 +722,39 @@ def fallback_age_recommendations(age_tag: str, region_code: str, fetch_total_per
 @st.cache_data(show_spinner=False, ttl=600)
 def keyword_ranked_recos(age_tag: str, region_code: str, per_keyword: int = 6) -> dict:
     keywords = build_age_seed_queries(age_tag, topk=8)
-    board = {}
-    for kw in keywords:
-        try:
-            rows = search_youtube(
-                kw, fetch_total=120,
-                cc_only=False, upload_window="최근 1년",
-                include_channels=[], exclude_channels=[],
-                include_channel_ids=[], exclude_channel_ids=[],
-                include_words=[], exclude_words=[],
-                region_code=region_code, relevance_lang=None,
-                safe_mode="moderate", order_mode="viewCount",
-                duration_param="any", min_seconds=None, max_seconds=None,
-                age_tag=age_tag,
-            )
-            board[kw] = rows[:per_keyword]
-        except Exception:
-            board[kw] = []
-    return board
+    results = _age_seed_search_many(keywords, age_tag, region_code, 120)
+    return {kw: rows[:per_keyword] for kw, rows in results.items()}
 
 # =========================
 # Tokens & OCR for source trace
 # =========================
-TOKEN_PATTERNS = [
-    re.compile(r"@[\w\.\-]{3,}"),
-    re.compile(r"#[0-9]{4,}"),
-]
+# @핸들 / #숫자ID 를 한 번의 스캔으로 추출
+_TOKEN_RE = re.compile(r"@[\w\.\-]{3,}|#[0-9]{4,}")
 
 def extract_tokens_from_text(txt: str) -> set[str]:
-    toks = set()
-    if not txt: return toks
-    for pat in TOKEN_PATTERNS:
-        toks.update(pat.findall(txt))
-    return {t for t in toks if len(t) >= 4}
+    if not txt: return set()
+    return {t for t in _TOKEN_RE.findall(txt) if len(t) >= 4}
+
+OCR_MAX_SIZE = (800, 800)
+
+@st.cache_data(show_spinner=False, ttl=24*3600)
+def _ocr_tokens_cached(thumb_url: str) -> set[str]:
+    # 다운로드/인식 실패는 예외로 올려 보냄 — st.cache_data 는 예외를 캐시하지 않으므로 다음 열람 때 재시도
+    data = http_get_bytes(thumb_url, timeout=8)
+    img = Image.open(io.BytesIO(data))
+    img.thumbnail(OCR_MAX_SIZE)  # Tesseract 비용은 픽셀 수에 비례 — 큰 이미지는 줄여서 인식
+    text = pytesseract.image_to_string(img, lang="eng")
+    return extract_tokens_from_text(text)
 
 def ocr_tokens_from_thumb(thumb_url: str) -> set[str]:
     if not HAS_OCR or not thumb_url: return set()
     try:
-        data = http_get_bytes(thumb_url, timeout=8)
-        img = Image.open(io.BytesIO(data))
-        text = pytesseract.image_to_string(img, lang="eng")
-        return extract_tokens_from_text(text)
+        return _ocr_tokens_cached(thumb_url)
     except Exception:
         return set()
 
 def collect_source_tokens(row: dict, *, try_ocr=True) -> set[str]:
+    # 제목/설명 정규식은 가벼워서 매번 계산, 비용이 큰 OCR 만 썸네일 URL 단위로 캐시
     toks = set()
     toks |= extract_tokens_from_text(row.get("title",""))
     toks |= extract_tokens_from_text(row.get("description",""))
@@ -546,7 +765,7 @@ def collect_source_tokens(row: dict, *, try_ocr=True) -> set[str]:
 # =========================
 # External web search (Google CSE 전용)
 # =========================
-@st.cache_data(show_spinner=False, ttl=300)
+@st.cache_data(show_spinner=False, ttl=3600)
 def web_search(query: str, *, num: int = 10):
     results = []
     if CSE_API_KEY and CSE_CX:
@@ -565,33 +784,38 @@ def web_search(query: str, *, num: int = 10):
             pass
     return results
 
-def domain_weight(url: str) -> float:
-    if not url: return 0
-    u = url.lower()
-    if "tiktok.com" in u: return 3.0
-    if "instagram.com" in u: return 2.5
-    if "facebook.com" in u or "fb.watch" in u: return 1.8
-    if "x.com" in u or "twitter.com" in u: return 1.6
-    if "naver.com" in u or "daum.net" in u: return 1.2
+_HOST_RE = re.compile(r"^(?:https?://)?(?:www\.)?([^/:?#]+)", re.IGNORECASE)
+_DOMAIN_WEIGHTS = {
+    "tiktok.com": 3.0, "instagram.com": 2.5,
+    "facebook.com": 1.8, "fb.watch": 1.8,
+    "x.com": 1.6, "twitter.com": 1.6,
+    "naver.com": 1.2, "daum.net": 1.2,
+}
+
+def _extract_host(url: str) -> str:
+    m = _HOST_RE.match(url or "")
+    return m.group(1).lower() if m else ""
+
+def host_weight(host: str) -> float:
+    for d, w in _DOMAIN_WEIGHTS.items():
+        if host == d or host.endswith("." + d): return w
     return 1.0
 
+_KEYPHRASE_RE        = re.compile(r"[A-Za-z가-힣0-9]{2,}")
+_KEYPHRASE_STOPWORDS = frozenset(["the","and","you","for","with","this","that","are","from","제","것","해서","그리고","하지만","그러나","근데","이건","저건","에서","하다"])
+
 def extract_keyphrases(text: str, *, topk=5) -> list[str]:
     if not text: return []
-    words = re.findall(r"[A-Za-z가-힣0-9]{2,}", text.lower())
-    stop = set(["the","and","you","for","with","this","that","are","from","제","것","해서","그리고","하지만","그러나","근데","이건","저건","에서","하다"])
-    freq = {}
-    for w in words:
-        if w in stop: continue
-        freq[w] = freq.get(w, 0) + 1
-    keys = [w for w,_ in sorted(freq.items(), key=lambda x: x[1], reverse=True)]
-    keys = [k for k in keys if len(k) >= 3][:topk]
-    return keys
+    words = _KEYPHRASE_RE.findall(text.lower())
+    cnt = Counter(w for w in words if len(w) >= 3 and w not in _KEYPHRASE_STOPWORDS)
+    return [w for w,_ in cnt.most_common(topk)]
 
 def rank_external_results(tokens: set[str], title: str, results: list[dict], extra_keys: list[str]) -> list[dict]:
     if not results: return []
     toks = {t.lower() for t in tokens}
     keys = {k.lower() for k in extra_keys}
     tlo = (title or "").lower()
+    tlo_prefix, tlo_words = tlo[:20], tlo.split()[:3]  # 루프 불변값은 한 번만 계산
     ranked = []
     for r in results:
         b = (r.get("title","") + " " + r.get("snippet","")).lower()
@@ -599,20 +823,21 @@ def rank_external_results(tokens: set[str], title: str, results: list[dict], ext
         hit_key = sum(1 for k in keys if k in b)
         if hit_tok==0 and hit_key==0:
             continue
-        dom = domain_weight(r.get("link",""))
-        title_sim = 1.0 if any(w for w in [tlo[:20], *tlo.split()[:3]] if w and w in b) else 0.0
+        link = r.get("link","")
+        host = _extract_host(link)  # 가중치와 도메인 중복 제한에 같이 사용
+        dom = host_weight(host) if link else 0
+        title_sim = 1.0 if (tlo_prefix and tlo_prefix in b) or any(w in b for w in tlo_words) else 0.0
         score = hit_tok*2.0 + hit_key*1.2 + dom + title_sim
         r2 = dict(r)
         r2["_ext_score"] = round(score, 3)
-        ranked.append(r2)
-    ranked.sort(key=lambda x: x["_ext_score"], reverse=True)
+        ranked.append((r2, host))
+    ranked.sort(key=lambda x: x[0]["_ext_score"], reverse=True)
     seen_domain = {}
     filtered = []
-    for r in ranked:
-        d = re.sub(r"^https?://(www\.)?","", r["link"]).split("/")[0]
-        c = seen_domain.get(d, 0)
+    for r, host in ranked:
+        c = seen_domain.get(host, 0)
         if c >= 2: continue
-        seen_domain[d] = c+1
+        seen_domain[host] = c+1
         filtered.append(r)
     return filtered[:12]
 
@@ -642,19 +867,33 @@ def title_bar():
     with right3:
         st.markdown(btn_html.format(href="https://www.pexels.com/videos/", label="Pexels"), unsafe_allow_html=True)
 
-def thumb_with_badge(url, duration_text, views):
-    dur = duration_text or ""
-    vtx = fmt_int(views) if views is not None else ""
-    html = f"""
+_THUMB_TPL = """
 <div class="thumb-wrap">
   <img src="{url}" class="thumb-img"/>
   <div class="badge-wrap">
-    <span class="badge">{'⏱ ' + dur if dur else ''}</span>
-    <span class="badge">{'👀 ' + vtx if vtx else ''}</span>
+    <span class="badge">{dur}</span>
+    <span class="badge">{vtx}</span>
   </div>
 </div>
 """
-    st.markdown(html, unsafe_allow_html=True)
+_CARD_TITLE_TPL = "<div style='font-weight:800; font-size:1.02rem; margin:6px 0 2px'>{title}</div>"
+_CARD_CHIPS_TPL = "<div style='font-size:0.875rem; opacity:0.6; margin-bottom:8px'>{chips}</div>"
+_CARD_LINK_TPL  = """<a href="{url}" target="_blank" class="btn-link small" style="display:block;text-align:center;">원본링크</a>"""
+# 카드 칩 필드 → 표시 문자열
+_CHIP_FMT = {
+    "author":       lambda v: f"제작자 {v}",
+    "views":        lambda v: f"조회수 {fmt_int(v)}",
+    "durationText": lambda v: f"길이 {v}",
+    "publishedAt":  lambda v: f"게시 {str(v)[:10]}",
+}
+
+def thumb_badge_html(url, duration_text, views) -> str:
+    dur = duration_text or ""
+    vtx = fmt_int(views) if views is not None else ""
+    return _THUMB_TPL.format(url=url, dur="⏱ " + dur if dur else "", vtx="👀 " + vtx if vtx else "")
+
+def thumb_with_badge(url, duration_text, views):
+    st.markdown(thumb_badge_html(url, duration_text, views), unsafe_allow_html=True)
 
 def insta_card_wrap(func):
     def inner(*args, **kwargs):
@@ -664,7 +903,7 @@ def insta_card_wrap(func):
     return inner
 
 def page_controls(total_count: int, where: str):
-    total_pages = max(1, math.ceil(total_count / st.session_state.page_size))
+    total_pages = max(1, -(-total_count // st.session_state.page_size))
     l, c, r = st.columns([1,2,1])
     with c:
         nav = st.columns(4, gap="small")
@@ -678,16 +917,17 @@ def page_controls(total_count: int, where: str):
             st.button("마지막 ⏭", key=f"{where}_last", on_click=lambda: st.session_state.update(page=total_pages))
         st.caption(f"페이지 {st.session_state.page} / {total_pages} · 한 페이지 {st.session_state.page_size}개")
 
-def slice_df_for_page(df: pd.DataFrame) -> pd.DataFrame:
-    if df is None or df.empty: return df
+def slice_for_page(items: list[dict]) -> list[dict]:
     ps = st.session_state.page_size; pg = st.session_state.page
-    return df.iloc[(pg-1)*ps : (pg-1)*ps + ps]
+    if pg == 1 and len(items) <= ps: return items  # 한 페이지에 다 들어가면 슬라이스 복사 생략
+    return items[(pg-1)*ps : (pg-1)*ps + ps]
 
 # =========================
 # CSS — 다크모드만 유지
 # =========================
-def inject_css(accent="#00A389"):
-    st.markdown(f"""
+@functools.lru_cache(maxsize=8)
+def build_css(accent: str) -> str:
+    return f"""
 <style>
 :root {{
   --accent: {accent};
@@ -745,68 +985,77 @@ details[open] {{ background:#0c101b; }}
 div[data-testid="column"] > div:has(> .stButton) {{ display:flex; justify-content:center; }}
 
 </style>
-""", unsafe_allow_html=True)
+"""
+
+def inject_css(accent="#00A389"):
+    # <style> 요소는 rerun 마다 다시 내보내야 유지됨 — 문자열 조립만 accent 별로 캐시
+    st.markdown(build_css(accent), unsafe_allow_html=True)
 
 # =========================
 # Renderers
 # =========================
+# 분석/추적 화면 안의 위젯 조작은 해당 화면만 다시 그린다 (st.fragment 미지원 버전은 그대로)
+fragment = getattr(st, "fragment", None) or (lambda f: f)
+
+
+def _open_analysis(r: dict):
+    # 카드마다 클로저를 만들지 않도록 공용 콜백 + args 로 행 전달 (콜백 뒤에는 자동으로 rerun 됨)
+    st.query_params["view"] = "analysis"
+    st.query_params["vid"]  = r.get("videoId","")
+    st.session_state["analysis_target"] = r
+    st.session_state["trigger_analysis"] = True
+
 @insta_card_wrap
-def render_cards(df: pd.DataFrame, *, cols: int, subtitles: list[str], bookmark_key_prefix: str):
-    if df is None or df.empty:
+def render_cards(records: list[dict], *, cols: int, subtitles: list[str], bookmark_key_prefix: str):
+    if not records:
         st.info("결과가 없습니다."); return
-    rows = math.ceil(len(df)/cols)
+    n = len(records)
+    rows = -(-n // cols)
+    # 칩 문자열은 페이지 단위로 먼저 만들어 둠 (필드별 포맷터는 카드마다 분기하지 않고 한 번만 고름)
+    fmts = [(k, _CHIP_FMT[k]) for k in subtitles if k in _CHIP_FMT]
+    chip_lines = [" · ".join(f(row[k]) for k, f in fmts if row.get(k) not in (None,"",0)) for row in records]
     for r in range(rows):
         ccols = st.columns(cols, gap="large")
         for i in range(cols):
             idx = r*cols + i
-            if idx >= len(df): break
-            row = df.iloc[idx].to_dict()
+            if idx >= n: break
+            row = records[idx]
             with ccols[i]:
-                if row.get("thumbnail"):
-                    thumb_with_badge(row["thumbnail"], row.get("durationText",""), row.get("views"))
                 title = row.get("title", "Untitled"); url = row.get("url", "#")
-                st.markdown(f"<div style='font-weight:800; font-size:1.02rem; margin:6px 0 2px'>{title}</div>", unsafe_allow_html=True)
-
-                chips=[]
-                for key in subtitles:
-                    val=row.get(key)
-                    if val in (None,"",0): continue
-                    if key=="author": chips.append(f"제작자 {val}")
-                    elif key=="views": chips.append(f"조회수 {fmt_int(val)}")
-                    elif key=="durationText": chips.append(f"길이 {val}")
-                    elif key=="publishedAt": chips.append(f"게시 {str(val)[:10]}")
-                if chips: st.caption(" · ".join(chips))
+                # 썸네일 + 제목 + 칩을 한 블록으로 (카드당 markdown 호출 1회)
+                # 카드 폭(3열)에는 medium(320x180) 이면 충분 — high(480x360, 레터박스 포함)는 분석 화면/OCR 용
+                thumb = row.get("thumbCard") or row.get("thumbnail")
+                parts = [thumb_badge_html(thumb, row.get("durationText",""), row.get("views"))] if thumb else []
+                # 블록이 HTML 이라 제목/채널명의 <, & 등이 태그로 해석되지 않게 이스케이프
+                parts.append(_CARD_TITLE_TPL.format(title=html.escape(title)))
+                if chip_lines[idx]: parts.append(_CARD_CHIPS_TPL.format(chips=html.escape(chip_lines[idx])))
+                st.markdown("".join(parts), unsafe_allow_html=True)
 
                 # ⬇️ 버튼 2개만: 원본링크 / 영상분석 (원본찾기 버튼 제거)
                 b1, b2 = st.columns(2, gap="small")
                 with b1:
-                    st.markdown(f"""<a href="{url}" target="_blank" class="btn-link small" style="display:block;text-align:center;">원본링크</a>""", unsafe_allow_html=True)
+                    st.markdown(_CARD_LINK_TPL.format(url=url), unsafe_allow_html=True)
                 with b2:
-                    def _open_analysis(r=row):
-                        st.query_params["view"] = "analysis"
-                        st.query_params["vid"]  = r.get("videoId","")
-                        st.session_state["analysis_target"] = r
-                        st.session_state["trigger_analysis"] = True
-                        st.rerun()
-                    st.button("영상분석", key=f"an_{bookmark_key_prefix}_{idx}_{abs(hash(url))%10_000_000}", use_container_width=True, on_click=_open_analysis)
-
-def render_results(df_all: pd.DataFrame):
-    total_rows = len(df_all)
+                    st.button("영상분석", key=f"an_{bookmark_key_prefix}_{idx}_{row.get('videoId') or idx}", use_container_width=True,
+                              on_click=_open_analysis, args=(row,))
+
+def render_results(items: list[dict]):
+    total_rows = len(items)
     if total_rows == 0:
         st.info("YouTube 결과가 없습니다."); return
     page_controls(total_rows, where="top")
-    df_page = slice_df_for_page(df_all)
+    page = slice_for_page(items)
 
     st.subheader("🎬 YouTube")
-    tab_all, tab_shorts, tab_video = st.tabs(["전체","쇼츠","영상"])
-    with tab_all:
-        render_cards(df_page, cols=3, subtitles=["author","views","durationText","publishedAt"], bookmark_key_prefix="yt")
-    with tab_shorts:
-        df_s = df_page.loc[df_page["isShorts"]==True] if "isShorts" in df_page.columns else df_page.iloc[0:0]
-        render_cards(df_s, cols=3, subtitles=["author","views","durationText","publishedAt"], bookmark_key_prefix="yt_s")
-    with tab_video:
-        df_v = df_page.loc[df_page["isShorts"]==False] if "isShorts" in df_page.columns else df_page.iloc[0:0]
-        render_cards(df_v, cols=3, subtitles=["author","views","durationText","publishedAt"], bookmark_key_prefix="yt_v")
+    # st.tabs 는 세 탭을 모두 렌더링하므로(카드 ×3) 선택된 보기 하나만 그린다
+    view = st.radio("보기", ["전체","쇼츠","영상"], horizontal=True, key="yt_view", label_visibility="collapsed")
+    subtitles = ["author","views","durationText","publishedAt"]
+    if view == "전체":
+        render_cards(page, cols=3, subtitles=subtitles, bookmark_key_prefix="yt")
+    else:
+        want_shorts = view == "쇼츠"
+        page_view = [r for r in page if bool(r.get("isShorts")) == want_shorts]
+        render_cards(page_view, cols=3, subtitles=subtitles, bookmark_key_prefix="yt_s" if view == "쇼츠" else "yt_v")
 
     page_controls(total_rows, where="bottom")
     st.markdown("---")
@@ -814,48 +1063,64 @@ def render_results(df_all: pd.DataFrame):
 # =========================
 # Analysis View
 # =========================
-def fetch_transcript_any(video_id: str):
+@st.cache_data(show_spinner=False, ttl=24*3600)
+def _fetch_transcript_lang(video_id: str, lang: str) -> str | None:
+    """
+    한 언어의 자막 텍스트. 자막 없음/비활성은 None 으로 캐시. 네트워크·차단 등 일시 오류는 예외로 올려 보내
+    캐시에 남지 않게 함 (st.cache_data 는 예외를 캐시하지 않음).
+    """
     try:
-        from youtube_transcript_api import (
-            YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, CouldNotRetrieveTranscript
-        )
+        from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
     except Exception:
-        return (None, None)
+        return None
     try:
+        tr = YouTubeTranscriptApi.get_transcript(video_id, languages=[lang])
+    except (TranscriptsDisabled, NoTranscriptFound):
+        return None
+    txt = "\n".join([s.get("text","").strip() for s in tr if s.get("text")])
+    return txt if txt.strip() else None
+
+def fetch_transcript_any(video_id: str) -> tuple[str | None, str | None]:
+    # 언어별로 따로 캐시 — ko 가 일시 오류로 실패해 en 을 보여줘도 다음 열람 때 ko 를 다시 시도
+    for lang in ("ko", "en"):
         try:
-            tr = YouTubeTranscriptApi.get_transcript(video_id, languages=["ko"])
-            txt = "\n".join([s.get("text","").strip() for s in tr if s.get("text")])
-            if txt.strip(): return (txt, "ko")
-        except Exception: pass
-        tr = YouTubeTranscriptApi.get_transcript(video_id, languages=["en"])
-        txt = "\n".join([s.get("text","").strip() for s in tr if s.get("text")])
-        if txt.strip(): return (txt, "en")
-    except (TranscriptsDisabled, NoTranscriptFound, CouldNotRetrieveTranscript):
-        return (None, None)
-    except Exception:
-        return (None, None)
+            txt = _fetch_transcript_lang(video_id, lang)
+            if txt: return (txt, lang)
+        except Exception:
+            pass
+    return (None, None)
+
+_WORD_RE   = re.compile(r"[A-Za-z가-힣0-9]+")
+_STOPWORDS = frozenset(["그리고","그래서","하지만","그러나","그냥","근데","이건","저건","에서","하다","the","and","to","of","in","a","is"])
 
-def chunk_transcript(transcript: str, max_chars=300) -> list[dict]:
-    chunks, buf = [], []
+def _count_words(cnt: Counter, text: str):
+    cnt.update(w for w in _WORD_RE.findall(text.lower()) if len(w)>1 and w not in _STOPWORDS)
+
+def analyze_transcript(transcript: str, max_chars=300, *, max_chunks: int | None = None, topk: int = 5):
+    """
+    자막을 줄 단위로 한 번만 훑으면서 청크 분할과 단어 빈도 집계를 같이 함.
+    max_chunks 개 청크가 차면 분할만 멈추고 집계는 자막 끝까지 계속. topk=0 이면 집계 생략.
+    반환: (chunks, 상위 키워드 리스트)
+    """
+    # n = 지금까지 " ".join(buf) 의 길이 — 매 줄마다 문자열을 다시 합치지 않음
+    chunks, buf, n, cnt, full = [], [], 0, Counter(), False
     for line in transcript.splitlines():
-        if len(" ".join(buf+[line])) > max_chars:
-            chunks.append({"idx": len(chunks)+1, "text": " ".join(buf)}); buf=[line]
+        if topk: _count_words(cnt, line)
+        if full: continue
+        add = len(line) + (1 if buf else 0)
+        if buf and n + add > max_chars:
+            chunks.append({"idx": len(chunks)+1, "text": " ".join(buf)}); buf, n = [line], len(line)
+            if max_chunks is not None and len(chunks) >= max_chunks:
+                buf, full = [], True
+                if not topk: break
         else:
-            buf.append(line)
+            buf.append(line); n += add
     if buf: chunks.append({"idx": len(chunks)+1, "text":" ".join(buf)})
-    return chunks
+    return chunks, [w for w,_ in cnt.most_common(topk)] if topk else []
 
-def heuristic_prompts(title: str, transcript: str | None):
+def heuristic_prompts(title: str, keywords: list[str] | None = None):
     title_s = (title or "").strip()
-    base_kw = []
-    if transcript:
-        words = re.findall(r"[A-Za-z가-힣0-9]+", transcript.lower())
-        stop = set(["그리고","그래서","하지만","그러나","그냥","근데","이건","저건","에서","하다","the","and","to","of","in","a","is"])
-        freq = {}
-        for w in words:
-            if len(w)<=1 or w in stop: continue
-            freq[w] = freq.get(w,0)+1
-        base_kw = [w for w,_ in sorted(freq.items(), key=lambda x:x[1], reverse=True)[:5]]
+    base_kw = keywords or []
     hook = f"{title_s[:40]}? 핵심만 집어서 말할게요." if title_s else "핵심만 집어서 말할게요."
     problem = "사람들이 놓치는 포인트를 짧게 정리해볼까요?"
     solution = f"키워드: {', '.join(base_kw)}" if base_kw else "핵심 키워드를 추리고 메시지를 압축하세요."
@@ -864,6 +1129,7 @@ def heuristic_prompts(title: str, transcript: str | None):
     image_prompt = f'포토리얼, 밝은 톤, 주제: "{title_s}", 핵심어: {", ".join(base_kw) if base_kw else "간결/선명/집중"}'
     return shorts_script, image_prompt
 
+@fragment
 def render_analysis_view(row: dict):
     st.markdown('<div class="analysis-back">', unsafe_allow_html=True)
     if st.button("✖ 닫기(목록으로)", use_container_width=True, key=f"back_{row.get('videoId','')}"):
@@ -891,22 +1157,17 @@ def render_analysis_view(row: dict):
         with col_a1:
             st.caption(" ")
         with col_a2:
-            def _open_trace_from_analysis(r=row):
-                if not r.get("isShorts"):
-                    st.warning("‘원본찾기’는 숏츠에서만 제공됩니다.")
-                    return
-                st.session_state["analysis_target"] = r
-                st.query_params["view"] = "trace"
-                st.query_params["vid"]  = r.get("videoId","")
-                st.rerun()
-
-            st.button(
+            # 프래그먼트 안이므로 콜백 대신 클릭 후 전체 rerun 으로 화면 전환
+            if st.button(
                 "🧭 원본찾기 (숏츠 전용)",
                 key=f"btn_trace_in_analysis_{row.get('videoId','')}",
                 disabled=not is_shorts,
                 use_container_width=True,
-                on_click=_open_trace_from_analysis
-            )
+            ):
+                st.session_state["analysis_target"] = row
+                st.query_params["view"] = "trace"
+                st.query_params["vid"]  = row.get("videoId","")
+                st.rerun()
 
     vid = row.get("videoId")
     if not vid:
@@ -921,21 +1182,32 @@ def render_analysis_view(row: dict):
     if not transcript:
         st.warning("자막을 가져오지 못했습니다."); return
 
-    show_text = transcript if lang == "ko" else translate_block_to_ko(transcript)
+    # 화면에 보이는 앞 12개 섹션만 번역 (전체 자막을 번역한 뒤 잘라 버리지 않음)
+    # 한국어 자막이면 청크 분할과 키워드 집계(자막 전체)를 한 번의 순회로 (번역본은 번역된 조각에서 집계)
+    chunks, keywords = analyze_transcript(transcript, 350, max_chunks=12, topk=5 if lang == "ko" else 0)
+    if lang != "ko":
+        try:
+            ko_texts = translate_chunks_to_ko(tuple(ch["text"] for ch in chunks))
+            chunks = [{"idx": ch["idx"], "text": t or ch["text"]} for ch, t in zip(chunks, ko_texts)]
+        except _TranslateFailed:
+            pass  # 번역 실패 시 원문 조각 표시 — 다음 열람 때 다시 번역 시도
+        cnt = Counter()
+        for ch in chunks: _count_words(cnt, ch["text"])
+        keywords = [w for w,_ in cnt.most_common(5)]
     st.markdown("### 📝 자막 / 타임라인(요약)")
-    chunks = chunk_transcript(show_text, max_chars=350)
-    for ch in chunks[:12]:
+    for ch in chunks:
         with st.expander(f"섹션 {ch['idx']}", expanded=False):
             st.write(ch["text"])
 
     st.markdown("### ✍️ 숏츠 대본 씨앗 & 이미지 프롬프트 (한국어)")
-    shorts_script, image_prompt = heuristic_prompts(row.get("title",""), show_text)
+    shorts_script, image_prompt = heuristic_prompts(row.get("title",""), keywords)
     st.text_area("숏츠 대본(후킹/문제/해결/CTA)", shorts_script, height=150, key=f"seed_script_{vid}")
     st.text_area("이미지/영상 프롬프트 시드", image_prompt, height=100, key=f"seed_prompt_{vid}")
 
 # =========================
 # Trace View (숏츠 원본찾기)
 # =========================
+@fragment
 def render_trace_view(row: dict):
     if st.button("✖ 닫기(목록으로)", use_container_width=True, key=f"trace_close_{row.get('videoId','')}"):
         st.query_params.clear()
@@ -965,7 +1237,6 @@ def render_trace_view(row: dict):
     st.caption("핵심 키워드: " + (key_str if key_str else "—"))
 
     token_q = " OR ".join(sorted(tokens))[:180] if tokens else ""
-    site_pool = ["tiktok.com","instagram.com","facebook.com","x.com","twitter.com","reddit.com","9gag.com","imgur.com","bilibili.com","tv.naver.com","kakao.tv"]
     all_results = []
 
     with st.status("웹에서 원본 후보 검색 중…", expanded=True) as status:
@@ -973,23 +1244,17 @@ def render_trace_view(row: dict):
             st.error("외부 웹검색 키가 필요합니다. secrets.toml에 CSE_API_KEY, CSE_CX를 설정해 주세요.")
             return
 
-        for site in site_pool:
-            if token_q and key_str:
-                q = f"({token_q}) {key_str} site:{site}"
-            elif token_q:
-                q = f"({token_q}) site:{site}"
-            else:
-                q = f"{key_str} site:{site}"
-            res = web_search(q, num=10)
-            all_results.extend(res)
-            time.sleep(0.1)
-
         if token_q and key_str:
-            all_results.extend(web_search(f"({token_q}) {key_str}", num=10))
+            base_q = f"({token_q}) {key_str}"
         elif token_q:
-            all_results.extend(web_search(f"({token_q})", num=10))
+            base_q = f"({token_q})"
         else:
-            all_results.extend(web_search(key_str, num=10))
+            base_q = key_str
+        # 사이트별 쿼리 + 전체 쿼리를 병렬로 (결과는 쿼리 순서대로 합침)
+        queries = [f"{base_q} site:{site}" for site in TRACE_SITE_POOL] + [base_q]
+        with ctx_executor() as ex:
+            for res in ex.map(lambda q: web_search(q, num=10), queries):
+                all_results.extend(res)
 
         status.update(label="후보 수집 완료", state="complete")
 
@@ -1013,8 +1278,7 @@ st.set_page_config(page_title="민석이의 작업실", page_icon="🛠️", lay
 init_state()
 
 # Accent
-accent_map = {"기본":"#00A389","블루":"#2F80ED","그린":"#27AE60","핑크":"#EB5757","보라":"#A259FF"}
-accent = accent_map.get(st.session_state.accent, "#00A389")
+accent = ACCENT_MAP.get(st.session_state.accent, "#00A389")
 
 # CSS + Title
 inject_css(accent)
@@ -1036,7 +1300,7 @@ with st.sidebar:
     if st.session_state.search_history:
         st.caption("최근 검색")
         hist_cols = st.columns(3)
-        for i, qv in enumerate(st.session_state.search_history[-9:][::-1]):
+        for i, qv in enumerate(list(reversed(st.session_state.search_history))[:9]):
             with hist_cols[i % 3]:
                 if st.button(qv, key=f"hist_{i}"):
                     st.session_state["_prefill_query"] = qv
@@ -1050,6 +1314,14 @@ with st.sidebar:
     # 🔧 검색 폼
     with st.form(key="search_form", clear_on_submit=False):
         query = st.text_input("검색 키워드", value=q_default, key="sb_query")
+        # 채널/단어 필터도 폼 안에 두어 입력 중에는 rerun 하지 않고 검색 시에만 반영 (값은 perform_search 에서 분리)
+        with st.expander("채널 / 제목 단어 필터", expanded=False):
+            st.text_input("포함 채널명(쉼표)", value="", key="sb_inc_chname")
+            st.text_input("제외 채널명(쉼표)", value="", key="sb_exc_chname")
+            st.text_input("포함 채널ID(쉼표)", value="", key="sb_inc_chid")
+            st.text_input("제외 채널ID(쉼표)", value="", key="sb_exc_chid")
+            st.text_input("제목에 반드시 포함(쉼표)", value="", key="sb_inc_words")
+            st.text_input("제목에 포함되면 제외(쉼표)", value="", key="sb_exc_words")
         submit_search = st.form_submit_button("검색", use_container_width=True, type="primary")
 
     st.markdown("---")
@@ -1074,26 +1346,21 @@ with st.sidebar:
 
     region_label = st.selectbox(
         "지역",
-        ["자동","한국(KR)","미국(US)","일본(JP)","영국(GB)","독일(DE)","프랑스(FR)","인도(IN)","인도네시아(ID)","브라질(BR)","멕시코(MX)"],
+        list(REGION_MAP),
         index=1, key="sb_region"
     )
-    region_map = {"자동":"", "한국(KR)":"KR", "미국(US)":"US", "일본(JP)":"JP", "영국(GB)":"GB",
-                  "독일(DE)":"DE", "프랑스(FR)":"FR", "인도(IN)":"IN", "인도네시아(ID)":"ID", "브라질(BR)":"BR", "멕시코(MX)":"MX"}
-    region_code = region_map[region_label] or "KR"
+    region_code = REGION_MAP[region_label] or "KR"
     st.session_state["region_code"] = region_code
 
     lang_label = st.selectbox(
         "언어",
-        ["자동","한국어(ko)","영어(en)","일본어(ja)","스페인어(es)","프랑스어(fr)","독일어(de)","인도네시아어(id)","포르투갈어(pt)","힌디어(hi)"],
+        list(LANG_MAP),
         index=1, key="sb_lang"
     )
-    lang_map = {"자동":"", "한국어(ko)":"ko", "영어(en)":"en", "일본어(ja)":"ja", "스페인어(es)":"es", "프랑스어(fr)":"fr", "독일어(de)":"de",
-                "인도네시아어(id)":"id", "포르투갈어(pt)":"pt", "힌디어(hi)":"hi"}
-    relevance_lang = lang_map[lang_label]
+    relevance_lang = LANG_MAP[lang_label]
 
-    ylen_label = st.selectbox("길이 필터", ["전체","짧음(<4분)","중간(4~20분)","긴(>20분)"], index=0, key="sb_ylen")
-    ylen_map = {"전체":"any","짧음(<4분)":"short","중간(4~20분)":"medium","긴(>20분)":"long"}
-    duration_param = ylen_map[ylen_label]
+    ylen_label = st.selectbox("길이 필터", list(YLEN_MAP), index=0, key="sb_ylen")
+    duration_param = YLEN_MAP[ylen_label]
 
     c1, c2 = st.columns(2)
     with c1:
@@ -1103,20 +1370,6 @@ with st.sidebar:
         max_sec = st.number_input("최대 길이(초)", min_value=0, max_value=86400, value=0, step=5, key="sb_maxsec")
         max_seconds = None if max_sec==0 else int(max_sec)
 
-    inc = st.text_input("포함 채널명(쉼표)", value="", key="sb_inc_chname")
-    exc = st.text_input("제외 채널명(쉼표)", value="", key="sb_exc_chname")
-    inc_ids = st.text_input("포함 채널ID(쉼표)", value="", key="sb_inc_chid")
-    exc_ids = st.text_input("제외 채널ID(쉼표)", value="", key="sb_exc_chid")
-    include_channels = [s.strip() for s in inc.split(",") if s.strip()]
-    exclude_channels = [s.strip() for s in exc.split(",") if s.strip()]
-    include_channel_ids = [s.strip() for s in inc_ids.split(",") if s.strip()]
-    exclude_channel_ids = [s.strip() for s in exc_ids.split(",") if s.strip()]
-
-    inc_words = st.text_input("제목에 반드시 포함(쉼표)", value="", key="sb_inc_words")
-    exc_words = st.text_input("제목에 포함되면 제외(쉼표)", value="", key="sb_exc_words")
-    include_words = [s.strip() for s in inc_words.split(",") if s.strip()]
-    exclude_words = [s.strip() for s in exc_words.split(",") if s.strip()]
-
     # =========================
     # 🔢 유닛 예상 위젯
     # =========================
@@ -1135,6 +1388,12 @@ with st.sidebar:
 # ===== 공통: 검색 실행 함수
 def perform_search(q: str):
     order_mode = "viewCount" if st.session_state.yt_sort=="조회수순" else "date"
+    ss = st.session_state
+    # 필터는 순서/중복과 무관하므로 정렬된 튜플로 정규화 — "a, b" 와 "b,a" 가 같은 캐시 항목을 씀
+    _norm = lambda k: tuple(sorted(set(split_csv(ss.get(k)))))
+    include_channels, exclude_channels = _norm("sb_inc_chname"), _norm("sb_exc_chname")
+    include_channel_ids, exclude_channel_ids = _norm("sb_inc_chid"), _norm("sb_exc_chid")
+    include_words, exclude_words = _norm("sb_inc_words"), _norm("sb_exc_words")
     try:
         yt_all = search_youtube(
             q,
@@ -1150,8 +1409,7 @@ def perform_search(q: str):
             duration_param=duration_param, min_seconds=min_seconds, max_seconds=max_seconds,
             age_tag=st.session_state.get("age_filter","전체"),
         )
-        df_all = pd.DataFrame(yt_all)
-        st.session_state.results_df = df_all
+        st.session_state.results = yt_all
         st.session_state.last_query = q
         st.session_state.last_params = {
             "region_code": st.session_state.get("region_code","KR"), "relevance_lang": relevance_lang, "duration_param": duration_param,
@@ -1184,7 +1442,7 @@ with st.container():
         with chip_row[i]:
             if st.button(a, key=f"age_{a}"):
                 st.session_state.age_filter = a
-                st.session_state.results_df = pd.DataFrame()
+                st.session_state.results = []
                 st.session_state["reco_clicks"] = 0
                 st.query_params.clear()
                 # 자동 모드라면 바로 로드 플래그 세팅
@@ -1241,8 +1499,7 @@ if st.session_state.get("want_reco_now", False):
         top_n = top_sorted[:12]
 
         st.subheader("🏆 연령대 TOP 12")
-        top_df = pd.DataFrame(top_n)
-        render_cards(top_df, cols=3, subtitles=["author","views","durationText","publishedAt"], bookmark_key_prefix="reco_top")
+        render_cards(top_n, cols=3, subtitles=["author","views","durationText","publishedAt"], bookmark_key_prefix="reco_top")
 
         remain = [r for r in reco_candidates if r not in top_n]
         if remain:
@@ -1250,8 +1507,7 @@ if st.session_state.get("want_reco_now", False):
             display = rnd.sample(remain, k=min(18, len(remain)))
             st.subheader("🔀 무작위 추천")
             st.caption("※ 연령 필터 + (있다면) 참여도/조회수 상위권의 큰 풀에서 무작위 추출")
-            reco_df = pd.DataFrame(display)
-            render_cards(reco_df, cols=3, subtitles=["author","views","durationText","publishedAt"], bookmark_key_prefix="reco")
+            render_cards(display, cols=3, subtitles=["author","views","durationText","publishedAt"], bookmark_key_prefix="reco")
     st.markdown("---")
 
 # ✅ 키워드별 랭킹 보드 (버튼 눌렀을 때만)
@@ -1269,8 +1525,7 @@ if st.session_state.get("want_kwboard_now", False):
         if not rows:
             continue
         st.markdown(f"### #{kw} 상위")
-        df_kw = pd.DataFrame(rows)
-        render_cards(df_kw, cols=3, subtitles=["author","views","durationText","publishedAt"], bookmark_key_prefix=f"kw_{kw}")
+        render_cards(rows, cols=3, subtitles=["author","views","durationText","publishedAt"], bookmark_key_prefix=f"kw_{kw}")
     st.markdown("---")
 
 # =========================
@@ -1283,29 +1538,28 @@ if submit_search or st.session_state.get("do_search_now", False):
         st.session_state["reco_clicks"] = 0  # 수동 검색 시 추천 섹션 숨김
         if current_q not in st.session_state.search_history:
             st.session_state.search_history.append(current_q)
-        if len(st.session_state.search_history) > 10:
-            st.session_state.search_history = st.session_state.search_history[-10:]
         with st.status("YouTube 검색 중…", expanded=True) as status:
             st.markdown('<span class="loading-badge"><span class="loading-dot"></span> API 호출 중…</span>', unsafe_allow_html=True)
             ok = perform_search(current_q)
             if ok: status.update(label="완료", state="complete")
             else:  status.update(label="오류", state="error")
 
+# 쿼리 파라미터는 여기서 한 번만 읽음 (이 아래에서는 URL 을 바꾸지 않음)
+qp = st.query_params.to_dict()
+qp_view, qp_vid = qp.get("view",""), qp.get("vid","")
+
 # 결과 렌더(페이지 이동 시 재검색 없이 계속 보이게)
-if not st.session_state.results_df.empty and st.query_params.get("view","") not in ("analysis","trace"):
-    render_results(st.session_state.results_df)
+if st.session_state.results and qp_view not in ("analysis","trace"):
+    render_results(st.session_state.results)
 
 # =========================
 # 라우팅: analysis / trace
 # =========================
-qp_view = st.query_params.get("view","")
 if qp_view == "analysis":
     target = st.session_state.get("analysis_target")
     if not target:
-        vid = st.query_params.get("vid","")
-        if vid and not st.session_state.results_df.empty:
-            row = st.session_state.results_df.loc[st.session_state.results_df["videoId"]==vid]
-            if not row.empty: target = row.iloc[0].to_dict()
+        if qp_vid:
+            target = next((r for r in st.session_state.results if r.get("videoId") == qp_vid), None)
     if target:
         render_analysis_view(target)
     else:
@@ -1314,10 +1568,8 @@ if qp_view == "analysis":
 elif qp_view == "trace":
     target = st.session_state.get("analysis_target")
     if not target:
-        vid = st.query_params.get("vid","")
-        if vid and not st.session_state.results_df.empty:
-            row = st.session_state.results_df.loc[st.session_state.results_df["videoId"]==vid]
-            if not row.empty: target = row.iloc[0].to_dict()
+        if qp_vid:
+            target = next((r for r in st.session_state.results if r.get("videoId") == qp_vid), None)
     if target and target.get("isShorts"):
         render_trace_view(target)
     elif target and not target.get("isShorts"):